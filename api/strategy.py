@@ -4,22 +4,62 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 import yfinance as yf
-import matplotlib.pyplot as plt
-from scipy.stats import norm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+import asyncio
 import base64
 from io import BytesIO
 from fredapi import Fred
-import ssl
+from filelock import FileLock
+from cachetools import TTLCache
+import hashlib
+import math
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib.request
+import xml.etree.ElementTree as ET
+import threading
 import time
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+# Numba is optional: without it the kernels below are never dispatched to and
+# the pandas rolling implementations are used instead.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# Bottleneck is optional: it provides C moving-window kernels (rank, std, ...).
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    bn = None
+    BOTTLENECK_AVAILABLE = False
+
+# pyarrow is optional: without it the on-disk price/yield cache is skipped.
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -55,16 +95,63 @@ try:
 except Exception as e:
     print(f"ERROR: Could not mount static files from {static_dir}: {e}")
 
-# Cache for financial data
-financial_cache = {}
+# Cache for financial data (bounded, entries expire after CACHE_DURATION)
 CACHE_DURATION = 3600  # 1 hour in seconds
+FINANCIAL_CACHE_SIZE = 256
+financial_cache = TTLCache(maxsize=FINANCIAL_CACHE_SIZE, ttl=CACHE_DURATION)
+financial_cache_lock = threading.Lock()
+
+# Persistent on-disk cache for price/yield series (parquet + JSON sidecar)
+PRICE_CACHE_DIR = pathlib.Path(
+    os.getenv("PRICE_CACHE_DIR", str(pathlib.Path.home() / ".cache" / "equity_strategizer"))
+)
+PRICE_CACHE_TTL_LIVE = 3600         # ranges that reach today: 1 hour
+PRICE_CACHE_TTL_HISTORICAL = 86400  # closed historical ranges: 24 hours
+
+# Shared keep-alive HTTP session (connection pool + retries on transient errors).
+# Worst case per request: 3 attempts x HTTP_TIMEOUT plus ~1.5 s backoff, which
+# stays under the 60 s series-cache lock timeout.
+HTTP_TIMEOUT = (5, 10)  # (connect, read) seconds
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=False,
+    ),
+)
+http_session.mount("https://", _http_adapter)
+http_session.mount("http://", _http_adapter)
+
+class PooledFred(Fred):
+    """
+    fredapi opens a new urllib connection for every request and has no session
+    hook, so route its private fetch helper through the shared session.
+    """
+    def _Fred__fetch_data(self, url):
+        # Raise ValueError on every failure, as fredapi itself does
+        try:
+            response = http_session.get(url + '&api_key=' + self.api_key, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            raise ValueError(f"FRED request failed: {e}")
+        if not response.ok:
+            try:
+                message = ET.fromstring(response.content).get('message')
+            except ET.ParseError:
+                message = None
+            raise ValueError(message or f"FRED returned HTTP {response.status_code}")
+        try:
+            return ET.fromstring(response.content)
+        except ET.ParseError as e:
+            raise ValueError(f"Unreadable FRED response: {e}")
 
 # Initialize FRED API (get free key at https://fred.stlouisfed.org/docs/api/)
 FRED_API_KEY = os.getenv("FRED_API_KEY", "")
 try:
-    # Bypass SSL verification for FRED API (workaround for certificate issues)
-    ssl._create_default_https_context = ssl._create_unverified_context
-    fred = Fred(api_key=FRED_API_KEY)
+    fred = PooledFred(api_key=FRED_API_KEY)
 except Exception as e:
     print(f"FRED initialization error: {e}")
     fred = None
@@ -74,17 +161,82 @@ TRADING_DAYS = 252
 # ============================================================
 # Volatility Regime Helpers
 # ============================================================
+def _rank_last(x: np.ndarray) -> float:
+    """
+    Tie-averaged rank of the last value of a raw window, divided by its length
+    (same as pd.Series(x).rank(pct=True).iloc[-1]). Module-level so pandas'
+    numba engine compiles it once and reuses the cached kernel.
+    """
+    last = x[-1]
+    return (np.sum(x < last) + 0.5 * (np.sum(x == last) + 1)) / x.size
+
 def _pct_rank(s: pd.Series, window: int) -> pd.Series:
     """
     Rolling percentile rank of the last value in each window.
     Returns 0..1 (NaN until enough history).
     """
-    def _rank_last(x):
-        x = pd.Series(x)
-        return (x.rank(pct=True).iloc[-1])
-    return s.rolling(window, min_periods=window).apply(_rank_last, raw=False)
+    if BOTTLENECK_AVAILABLE and 1 < window <= len(s):
+        # move_rank maps the (tie-averaged) rank of the last value onto [-1, 1];
+        # convert back to pandas' rank(pct=True) scale, i.e. rank / window.
+        ranks = bn.move_rank(s.to_numpy(dtype=np.float64), window=window, min_count=window)
+        pct = (((ranks + 1.0) / 2.0) * (window - 1) + 1.0) / window
+        return pd.Series(pct, index=s.index)
+
+    if window > len(s):
+        # Not enough history for a single window
+        return pd.Series(np.nan, index=s.index, dtype="float64")
+
+    if NUMBA_AVAILABLE:
+        return s.rolling(window, min_periods=window).apply(_rank_last, raw=True, engine="numba")
+    return s.rolling(window, min_periods=window).apply(_rank_last, raw=True)
+
+@njit(cache=True)
+def _zscore_nb(arr, w):
+    """
+    Fused rolling z-score: running sum and sum of squares over the window,
+    population std (ddof=0). NaN while the window holds fewer than `w` values
+    or its variance is zero within rounding.
+    """
+    n = arr.size
+    out = np.full(n, np.nan)
+    s = 0.0
+    s2 = 0.0
+    n_nan = 0
+    for i in range(n):
+        v = arr[i]
+        if np.isnan(v):
+            n_nan += 1
+        else:
+            s += v
+            s2 += v * v
+        if i >= w:
+            old = arr[i - w]
+            if np.isnan(old):
+                n_nan -= 1
+            else:
+                s -= old
+                s2 -= old * old
+        if i >= w - 1 and n_nan == 0:
+            m = s / w
+            var = s2 / w - m * m
+            # s2/w - m*m leaves cancellation noise on flat windows; treat it as
+            # zero variance (NaN), as pandas/bottleneck do
+            if var > 1e-14 * max(m * m, 1.0):
+                out[i] = (v - m) / np.sqrt(var)
+    return out
 
 def _zscore(s: pd.Series, window: int) -> pd.Series:
+    if NUMBA_AVAILABLE:
+        return pd.Series(_zscore_nb(s.to_numpy(dtype=np.float64), window), index=s.index)
+
+    if BOTTLENECK_AVAILABLE and window <= len(s):
+        arr = s.to_numpy(dtype=np.float64)
+        m = bn.move_mean(arr, window=window, min_count=window)
+        sd = bn.move_std(arr, window=window, min_count=window, ddof=0)
+        # Flat windows: same zero-variance tolerance as _zscore_nb -> NaN
+        sd[sd * sd <= 1e-14 * np.maximum(m * m, 1.0)] = np.nan
+        return pd.Series((arr - m) / sd, index=s.index)
+
     m = s.rolling(window, min_periods=window).mean()
     sd = s.rolling(window, min_periods=window).std(ddof=0)
     return (s - m) / sd
@@ -93,9 +245,25 @@ def _rvol_from_price(px: pd.Series, window: int = 20, ann_factor: int = 252) ->
     """
     Realized volatility from log returns, annualized.
     """
+    if BOTTLENECK_AVAILABLE and window <= len(px) - 1:
+        r = np.diff(np.log(px.to_numpy(dtype=np.float64)))
+        rv = bn.move_std(r, window=window, min_count=window, ddof=0) * math.sqrt(ann_factor)
+        return pd.Series(np.concatenate(([np.nan], rv)), index=px.index)
+
     r = np.log(px).diff()
+    if NUMBA_AVAILABLE:
+        rv = r.rolling(window, min_periods=window).std(
+            ddof=0, engine="numba", engine_kwargs={"nopython": True, "nogil": True, "parallel": False}
+        )
+        return rv * np.sqrt(ann_factor)
     return r.rolling(window, min_periods=window).std(ddof=0) * np.sqrt(ann_factor)
 
+def _label_series(codes: np.ndarray, categories: list[str], index: pd.Index) -> pd.Series:
+    """
+    Regime labels as a Categorical backed by int8 codes (-1 = no label / NaN).
+    """
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=index)
+
 def volatility_regime_from_vix(vix_close: pd.Series,
                                lookback_days: int = 252 * 5,
                                low_q: float = 0.33,
@@ -112,10 +280,10 @@ def volatility_regime_from_vix(vix_close: pd.Series,
     vix = vix_close.dropna()
     pr = _pct_rank(vix, lookback_days)
 
-    regime = pd.Series(index=vix.index, dtype="object")
-    regime[pr < low_q] = "LOW_VOL"
-    regime[(pr >= low_q) & (pr <= high_q)] = "MID_VOL"
-    regime[pr > high_q] = "HIGH_VOL"
+    arr = pr.to_numpy(dtype=np.float64)
+    codes = np.where(arr < low_q, 0, np.where(arr <= high_q, 1, 2)).astype(np.int8)
+    codes[np.isnan(arr)] = -1
+    regime = _label_series(codes, ["LOW_VOL", "MID_VOL", "HIGH_VOL"], pr.index)
 
     return {
         "vix_level": vix,
@@ -134,10 +302,10 @@ def volatility_regime_from_realized(stock_close: pd.Series,
     rv = _rvol_from_price(stock_close, window=rv_window)
     pr = _pct_rank(rv.dropna(), lookback_days)
 
-    regime = pd.Series(index=rv.index, dtype="object")
-    regime[pr < low_q] = "LOW_RVOL"
-    regime[(pr >= low_q) & (pr <= high_q)] = "MID_RVOL"
-    regime[pr > high_q] = "HIGH_RVOL"
+    arr = pr.to_numpy(dtype=np.float64)
+    codes = np.where(arr < low_q, 0, np.where(arr <= high_q, 1, 2)).astype(np.int8)
+    codes[np.isnan(arr)] = -1
+    regime = _label_series(codes, ["LOW_RVOL", "MID_RVOL", "HIGH_RVOL"], pr.index).reindex(rv.index)
 
     return {"realized_vol": rv, "rv_pct_rank": pr, "regime_label": regime}
 
@@ -169,12 +337,13 @@ def interest_rate_regime(y10_close: pd.Series,
     # Trend via MA slope (simple + robust)
     ma = y10.rolling(adaptive_window, min_periods=1).mean()
     ma_slope = ma.diff()  # day-over-day slope of MA
-    rate_trend = pd.Series(index=y10.index, dtype="object")
-    rate_trend[ma_slope > 0] = "RISING"
-    rate_trend[ma_slope <= 0] = "FALLING"
+    slope_arr = ma_slope.to_numpy(dtype=np.float64)
+    trend_codes = np.where(slope_arr > 0, 1, 0).astype(np.int8)
+    trend_codes[np.isnan(slope_arr)] = -1
+    rate_trend = _label_series(trend_codes, ["FALLING", "RISING"], y10.index)
 
     curve_slope = pd.Series(index=y10.index, dtype="float64")
-    curve_state = pd.Series(index=y10.index, dtype="object")
+    curve_codes = np.full(len(y10), -1, dtype=np.int8)
 
     if y2_close is not None:
         y2 = y2_close.dropna()
@@ -188,14 +357,15 @@ def interest_rate_regime(y10_close: pd.Series,
         else:
             y2_dec = y2
 
-        # Align indexes
-        y2_dec = y2_dec.reindex(y10.index).ffill()
-        curve_slope = (y10 - y2_dec).rolling(slope_window, min_periods=slope_window).mean()
-        curve_state[curve_slope < 0] = "INVERTED"
-        curve_state[curve_slope >= 0] = "NORMAL"
+        # Align indexes: forward-fill on the union of dates, evaluate on 10Y dates
+        yc = pd.concat([y10, y2_dec], axis=1, join="outer").ffill().loc[y10.index]
+        curve_slope = (yc.iloc[:, 0] - yc.iloc[:, 1]).rolling(slope_window, min_periods=slope_window).mean()
+        curve_arr = curve_slope.to_numpy(dtype=np.float64)
+        curve_codes = np.where(curve_arr < 0, 0, 1).astype(np.int8)
+        curve_codes[np.isnan(curve_arr)] = -1
     else:
         curve_slope[:] = np.nan
-        curve_state[:] = np.nan
+    curve_state = _label_series(curve_codes, ["INVERTED", "NORMAL"], y10.index)
 
     return {
         "y10_rate_decimal": y10,
@@ -225,20 +395,18 @@ def liquidity_regime(hyg_close: pd.Series,
       - ratio_z: rolling zscore
       - liquidity_label: 'TIGHT'/'NEUTRAL'/'EASY'
     """
-    hyg = hyg_close.dropna()
-    lqd = lqd_close.dropna()
-
-    idx = hyg.index.intersection(lqd.index)
-    hyg = hyg.reindex(idx).ffill()
-    lqd = lqd.reindex(idx).ffill()
+    # Align both legs in one frame: forward-fill gaps, drop the leading rows
+    # before both series have started
+    ab = pd.concat([hyg_close, lqd_close], axis=1, join="outer").ffill().dropna()
+    hyg, lqd = ab.iloc[:, 0], ab.iloc[:, 1]
 
     ratio = hyg / lqd
     ratio_z = _zscore(ratio, window)
 
-    liq = pd.Series(index=ratio.index, dtype="object")
-    liq[ratio_z <= z_low] = "TIGHT"
-    liq[(ratio_z > z_low) & (ratio_z < z_high)] = "NEUTRAL"
-    liq[ratio_z >= z_high] = "EASY"
+    z = ratio_z.to_numpy(dtype=np.float64)
+    codes = np.where(z <= z_low, 0, np.where(z < z_high, 1, 2)).astype(np.int8)
+    codes[np.isnan(z)] = -1
+    liq = _label_series(codes, ["TIGHT", "NEUTRAL", "EASY"], ratio.index)
 
     out = {
         "hyg_lqd_ratio": ratio,
@@ -270,15 +438,215 @@ class CalculationRequest(BaseModel):
     strike: float | None = None
     days: int = 30
 
+@njit(parallel=True, fastmath=True, cache=True)
+def black_scholes_call_vec(spot, strikes, time_years, rate, vol):
+    """
+    Black-Scholes call prices for an array of strikes (same spot, expiry,
+    rate and vol). sqrt(t) and the discount factor are computed once; the
+    normal CDF is inlined via math.erf. For strike grids only; single prices
+    go through black_scholes_call, which avoids starting the threading layer.
+    """
+    n = strikes.size
+    out = np.empty(n)
+    vol_sqrt_t = vol * math.sqrt(time_years)
+    drift = (rate + 0.5 * vol * vol) * time_years
+    discount = math.exp(-rate * time_years)
+    for i in prange(n):
+        k = strikes[i]
+        d1 = (math.log(spot / k) + drift) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
+        nd1 = 0.5 * (1.0 + math.erf(d1 * 0.7071067811865476))
+        nd2 = 0.5 * (1.0 + math.erf(d2 * 0.7071067811865476))
+        out[i] = spot * nd1 - k * discount * nd2
+    return out
+
+def _norm_cdf(z: float) -> float:
+    """Standard normal CDF for a scalar, via math.erf."""
+    return 0.5 * (1.0 + math.erf(z * 0.7071067811865476))
+
 def black_scholes_call(spot: float, strike: float, time_years: float, rate: float, vol: float) -> float:
     if spot <= 0 or strike <= 0 or time_years <= 0 or vol <= 0:
         raise ValueError("Spot, strike, time, and volatility must be positive.")
 
-    d1 = (np.log(spot / strike) + (rate + 0.5 * vol**2) * time_years) / (vol * np.sqrt(time_years))
-    d2 = d1 - vol * np.sqrt(time_years)
-    return float(spot * norm.cdf(d1) - strike * np.exp(-rate * time_years) * norm.cdf(d2))
+    vol_sqrt_t = vol * math.sqrt(time_years)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * vol * vol) * time_years) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    return float(spot * _norm_cdf(d1) - strike * math.exp(-rate * time_years) * _norm_cdf(d2))
+
+def _cache_date(value: str | datetime) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+def _cache_stop(end: str | None, end_inclusive: bool) -> str:
+    """Exclusive upper bound of a request; open-ended requests run through today."""
+    if end is None:
+        return _cache_date(datetime.now() + timedelta(days=1))
+    if end_inclusive:
+        return _cache_date(pd.Timestamp(end) + timedelta(days=1))
+    return _cache_date(end)
+
+def _series_cache_base(namespace: str) -> pathlib.Path | None:
+    """Writable cache directory for `namespace`, or None when caching is unavailable."""
+    if not PARQUET_AVAILABLE:
+        return None
+    base = PRICE_CACHE_DIR / namespace
+    try:
+        base.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return base if os.access(base, os.W_OK) else None
+
+def _series_cache_paths(base: pathlib.Path, key: str) -> tuple[pathlib.Path, pathlib.Path, pathlib.Path]:
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return base / f"{digest}.parquet", base / f"{digest}.json", base / f"{digest}.lock"
+
+def _read_cache_entry(data_path: pathlib.Path, meta_path: pathlib.Path):
+    if not (data_path.exists() and meta_path.exists()):
+        return None, None
+    try:
+        meta = json.loads(meta_path.read_text())
+        data = pd.read_parquet(data_path)["value"].rename(meta.get("name"))
+        return data, meta
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry {data_path}: {e}")
+        return None, None
 
-def fetch_prices(ticker: str, start: str, end: str | None) -> pd.Series:
+def _write_cache_entry(data_path: pathlib.Path, meta_path: pathlib.Path,
+                       data: pd.Series, start: str, stop: str,
+                       fetched_at: float | None = None) -> None:
+    try:
+        data.to_frame(name="value").to_parquet(data_path, compression="zstd")
+        meta_path.write_text(json.dumps({
+            "name": data.name,
+            "start": start,
+            "stop": stop,
+            "fetched_at": time.time() if fetched_at is None else fetched_at,
+        }))
+    except Exception as e:
+        print(f"Could not write cache entry {data_path}: {e}")
+
+def _cache_is_fresh(meta: dict) -> bool:
+    ttl = PRICE_CACHE_TTL_LIVE if meta["stop"] > _cache_date(datetime.now()) else PRICE_CACHE_TTL_HISTORICAL
+    return time.time() - meta["fetched_at"] < ttl
+
+def _slice_cached(data: pd.Series, start: str, stop: str) -> pd.Series:
+    mask = (data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(stop))
+    return data[mask]
+
+def _cached_series(namespace: str, key: str, start: str, end: str | None,
+                   fetch, end_inclusive: bool = False) -> pd.Series:
+    """
+    Serve `fetch(start, end)` through the on-disk cache.
+
+    Each key keeps one parquet file with the half-open range [start, stop) it
+    covers. A fresh entry that covers the request is sliced; one that starts
+    early enough but stops too soon only fetches the missing tail (the entry
+    keeps its original fetch time, and is left untouched if that fails). Entries
+    reaching today expire after PRICE_CACHE_TTL_LIVE, older ranges after
+    PRICE_CACHE_TTL_HISTORICAL. Without pyarrow or a writable cache
+    directory the series is fetched directly.
+    """
+    base = _series_cache_base(namespace)
+    if base is None:
+        return fetch(start, end)
+
+    req_start = _cache_date(start)
+    req_stop = _cache_stop(end, end_inclusive)
+    data_path, meta_path, lock_path = _series_cache_paths(base, key)
+
+    try:
+        lock = FileLock(str(lock_path), timeout=60)
+        lock.acquire()
+    except Exception as e:
+        print(f"Series cache unavailable for {key}: {e}")
+        return fetch(start, end)
+
+    try:
+        cached, meta = _read_cache_entry(data_path, meta_path)
+        if cached is not None and meta["start"] <= req_start:
+            if _cache_is_fresh(meta):
+                # Only business days in [stop, req_stop) can hold new observations
+                gap = pd.bdate_range(meta["stop"], pd.Timestamp(req_stop) - timedelta(days=1))
+                if meta["stop"] < req_stop and len(gap) > 0:
+                    try:
+                        tail = fetch(meta["stop"], end)
+                    except Exception as e:
+                        # Empty gap, HTTP error or network outage look alike here:
+                        # serve what is cached without extending the entry, so
+                        # the next call retries
+                        print(f"Tail fetch failed for {key}: {e}")
+                        tail = None
+                    if tail is not None:
+                        cached = pd.concat([cached, tail])
+                        cached = cached[~cached.index.duplicated(keep="last")].sort_index()
+                        _write_cache_entry(data_path, meta_path, cached, meta["start"], req_stop,
+                                           fetched_at=meta["fetched_at"])
+
+                hit = _slice_cached(cached, req_start, req_stop)
+                if not hit.empty:
+                    return hit
+
+        data = fetch(start, end)
+        _write_cache_entry(data_path, meta_path, data, req_start, req_stop)
+        return data
+    finally:
+        lock.release()
+
+def _cache_lookup(namespace: str, key: str, start: str, end: str | None) -> tuple[pd.Series | None, bool]:
+    """
+    Check the cache without fetching. Returns (slice, False) for a fresh entry
+    that fully covers the request, (None, True) for a fresh entry that starts
+    early enough and only lacks its tail, and (None, False) otherwise.
+    """
+    base = _series_cache_base(namespace)
+    if base is None:
+        return None, False
+    req_start = _cache_date(start)
+    req_stop = _cache_stop(end, False)
+    data_path, meta_path, lock_path = _series_cache_paths(base, key)
+    if not data_path.exists():
+        return None, False
+    try:
+        with FileLock(str(lock_path), timeout=60):
+            cached, meta = _read_cache_entry(data_path, meta_path)
+    except Exception as e:
+        print(f"Series cache unavailable for {key}: {e}")
+        return None, False
+    if cached is None or not _cache_is_fresh(meta) or meta["start"] > req_start:
+        return None, False
+    if meta["stop"] < req_stop:
+        return None, True
+    hit = _slice_cached(cached, req_start, req_stop)
+    return (None, False) if hit.empty else (hit, False)
+
+def _cache_store(namespace: str, key: str, data: pd.Series, start: str, end: str | None) -> None:
+    """
+    Merge a downloaded series into the cache entry for `key`. A fresh entry
+    that overlaps or touches the new range is extended and keeps its original
+    fetch time, a fresh disjoint entry is left as is, and a stale or missing
+    entry (or one the new range fully covers) is replaced.
+    """
+    base = _series_cache_base(namespace)
+    if base is None:
+        return
+    new_start = _cache_date(start)
+    new_stop = _cache_stop(end, False)
+    data_path, meta_path, lock_path = _series_cache_paths(base, key)
+    try:
+        with FileLock(str(lock_path), timeout=60):
+            cached, meta = _read_cache_entry(data_path, meta_path)
+            if (cached is None or not _cache_is_fresh(meta)
+                    or (new_start <= meta["start"] and meta["stop"] <= new_stop)):
+                _write_cache_entry(data_path, meta_path, data, new_start, new_stop)
+            elif new_start <= meta["stop"] and meta["start"] <= new_stop:
+                merged = pd.concat([cached, data])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                _write_cache_entry(data_path, meta_path, merged,
+                                   min(new_start, meta["start"]), max(new_stop, meta["stop"]),
+                                   fetched_at=meta["fetched_at"])
+    except Exception as e:
+        print(f"Series cache unavailable for {key}: {e}")
+
+def _download_prices(ticker: str, start: str, end: str | None) -> pd.Series:
     data = yf.download(ticker, start=start, end=end, auto_adjust=True, progress=False)
     if data.empty:
         raise ValueError(f"No data returned for {ticker}. Check ticker/date range or internet access.")
@@ -294,23 +662,136 @@ def fetch_prices(ticker: str, start: str, end: str | None) -> pd.Series:
 
     return close.rename(ticker)
 
+def fetch_prices(ticker: str, start: str, end: str | None) -> pd.Series:
+    return _cached_series(
+        "prices", ticker, start, end,
+        lambda s, e: _download_prices(ticker, s, e),
+    )
+
+def fetch_prices_batch(tickers: list[str], start: str, end: str | None) -> dict[str, pd.Series]:
+    """
+    Close prices for several tickers. Cached tickers are served from disk,
+    tickers whose cache entry only lacks recent rows go through fetch_prices
+    (tail fetch), and the rest are fetched with a single multi-ticker
+    yf.download. Tickers that cannot be fetched are left out of the result.
+    """
+    prices = {}
+    missing = []
+    tail_only = []
+    for ticker in dict.fromkeys(tickers):
+        hit, needs_tail = _cache_lookup("prices", ticker, start, end)
+        if hit is not None:
+            prices[ticker] = hit
+        elif needs_tail:
+            tail_only.append(ticker)
+        else:
+            missing.append(ticker)
+
+    if len(missing) > 1:
+        try:
+            data = yf.download(missing, start=start, end=end, auto_adjust=True,
+                               group_by="ticker", threads=True, progress=False)
+            for ticker in missing:
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                close = data[ticker]["Close"].dropna()
+                if close.empty:
+                    continue
+                prices[ticker] = close.rename(ticker)
+                _cache_store("prices", ticker, prices[ticker], start, end)
+        except Exception as e:
+            print(f"Batch download failed for {missing}: {e}")
+
+    # One request per ticker for tail-only entries and anything the batch did not return
+    for ticker in tail_only + [t for t in missing if t not in prices]:
+        try:
+            prices[ticker] = fetch_prices(ticker, start, end)
+        except Exception as e:
+            print(f"Price fetch failed for {ticker}: {e}")
+
+    return prices
+
+def _download_fred_series(series_id: str, start: str, end: str | None) -> pd.Series:
+    data = fred.get_series(series_id, observation_start=start, observation_end=end)
+    data = data.dropna()
+    if data.empty:
+        raise ValueError(f"No FRED data for {series_id}")
+    return data
+
 def fetch_fred_yield(series_id: str, start: str, end: str | None = None) -> pd.Series:
     """Fetch FRED yield data (e.g., DGS10 for 10-year, DGS2 for 2-year)"""
     if fred is None:
         raise ValueError("FRED API not initialized. Check API key.")
     try:
-        data = fred.get_series(series_id, observation_start=start, observation_end=end)
-        data = data.dropna()
-        if data.empty:
-            raise ValueError(f"No FRED data for {series_id}")
+        data = _cached_series(
+            "fred", series_id, start, end,
+            lambda s, e: _download_fred_series(series_id, s, e),
+            end_inclusive=True,
+        )
         return data / 100.0  # Convert from % to decimal
     except Exception as e:
         raise ValueError(f"FRED fetch error for {series_id}: {str(e)}")
 
-def compute_returns(prices: pd.Series) -> pd.Series:
-    return prices.pct_change().dropna()
+def compute_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simple returns for every column of an aligned price frame, computed in one
+    pass on a column-major ndarray. Rows with missing prices are dropped first;
+    the first row has no return and is omitted.
+    """
+    prices = prices.dropna()
+    px = np.asfortranarray(prices.to_numpy(dtype=np.float64))
+    rets = px[1:] / px[:-1] - 1.0
+    return pd.DataFrame(rets, index=prices.index[1:], columns=prices.columns)
+
+@njit(cache=True)
+def _rolling_beta_nb(x, y, w):
+    """
+    Single-pass rolling beta of x on y using running sums of x, y, x*y and y*y.
+    NaN until `w` observations are available and while any pair in the window
+    has a NaN (pairs with a NaN are kept out of the sums).
+    """
+    n = x.size
+    out = np.full(n, np.nan)
+    sx = sy = sxy = syy = 0.0
+    n_nan = 0
+    for i in range(n):
+        xi = x[i]
+        yi = y[i]
+        if np.isnan(xi) or np.isnan(yi):
+            n_nan += 1
+        else:
+            sx += xi
+            sy += yi
+            sxy += xi * yi
+            syy += yi * yi
+        if i >= w:
+            xj = x[i - w]
+            yj = y[i - w]
+            if np.isnan(xj) or np.isnan(yj):
+                n_nan -= 1
+            else:
+                sx -= xj
+                sy -= yj
+                sxy -= xj * yj
+                syy -= yj * yj
+        if i >= w - 1 and n_nan == 0:
+            mx = sx / w
+            my = sy / w
+            cov = sxy / w - mx * my
+            var = syy / w - my * my
+            if var > 0:
+                out[i] = cov / var
+    return out
 
 def rolling_beta(stock_ret: pd.Series, market_ret: pd.Series, window: int) -> pd.Series:
+    if NUMBA_AVAILABLE:
+        beta = _rolling_beta_nb(
+            stock_ret.to_numpy(dtype=np.float64),
+            market_ret.to_numpy(dtype=np.float64),
+            window,
+        )
+        return pd.Series(beta, index=stock_ret.index)
+
     cov = stock_ret.rolling(window).cov(market_ret)
     var = market_ret.rolling(window).var()
     return cov / var
@@ -347,18 +828,14 @@ def backtest_capm_strategy(
         total_days=int(strategy_returns.count()),
     )
 
-    # Calculate consecutive days in position - improved logic
+    # Calculate consecutive days in position - vectorized run-length:
+    # running count of held days minus the count at the most recent flat day
     signal_int = signal.astype(int)
     shifted_signal = signal_int.shift(1).fillna(0).astype(int)
-    days_in_position = pd.Series(0, index=signal.index)
-    counter = 0
-    for i in range(len(shifted_signal)):
-        if shifted_signal.iloc[i] == 1:
-            counter += 1
-            days_in_position.iloc[i] = counter
-        else:
-            counter = 0
-            days_in_position.iloc[i] = 0
+    held = shifted_signal.to_numpy(dtype=np.int64)
+    held_cumsum = held.cumsum()
+    last_reset = np.maximum.accumulate(np.where(held == 0, held_cumsum, 0))
+    days_in_position = pd.Series(held_cumsum - last_reset, index=signal.index)
 
     df = pd.DataFrame({
         "stock_ret": stock_ret,
@@ -381,41 +858,115 @@ def summarize_capm(stock_ret: pd.Series, market_ret: pd.Series, rf_annual: float
     vol = float(stock_ret.std() * np.sqrt(TRADING_DAYS))
     return {"beta": beta, "expected_market": expected_market, "expected_stock": expected_stock, "vol": vol}
 
-def generate_plot(bt_df: pd.DataFrame) -> str:
-    plt.figure(figsize=(10, 5))
-    plt.plot(bt_df.index, bt_df["equity_strategy"], label="Strategy", linewidth=2.5, color='#667eea')
-    plt.plot(bt_df.index, bt_df["equity_buyhold"], label="Buy & Hold", linewidth=2, alpha=0.6, color='#764ba2', linestyle='--')
-    plt.title("Equity Curves: Strategy vs Buy & Hold")
-    plt.xlabel("Date")
-    plt.ylabel("Growth of $1")
-    plt.legend(loc='best')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    
+# Plot figures are created once and redrawn per request; Agg is not
+# reentrant, so each figure is guarded by a lock.
+_fig_eq = Figure(figsize=(10, 5))
+_ax_eq = _fig_eq.add_subplot(111)
+_canvas_eq = FigureCanvasAgg(_fig_eq)
+_fig_eq_lock = threading.Lock()
+
+_fig_dd = Figure(figsize=(10, 4))
+_ax_dd = _fig_dd.add_subplot(111)
+_canvas_dd = FigureCanvasAgg(_fig_dd)
+_fig_dd_lock = threading.Lock()
+
+def _canvas_to_data_uri(canvas: FigureCanvasAgg) -> str:
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    img = Image.frombuffer("RGBA", (width, height), canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+
     buf = BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close()
+    img.save(buf, format="PNG", optimize=False, compress_level=1)
+    img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
     return f"data:image/png;base64,{img_base64}"
 
+def generate_plot(bt_df: pd.DataFrame) -> str:
+    with _fig_eq_lock:
+        ax = _ax_eq
+        ax.clear()
+        ax.plot(bt_df.index, bt_df["equity_strategy"], label="Strategy", linewidth=2.5, color='#667eea')
+        ax.plot(bt_df.index, bt_df["equity_buyhold"], label="Buy & Hold", linewidth=2, alpha=0.6, color='#764ba2', linestyle='--')
+        ax.set_title("Equity Curves: Strategy vs Buy & Hold")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Growth of $1")
+        ax.legend(loc='best')
+        ax.grid(True, alpha=0.3)
+        _fig_eq.tight_layout()
+        return _canvas_to_data_uri(_canvas_eq)
+
 def generate_drawdown_plot(bt_df: pd.DataFrame) -> str:
-    drawdown = (bt_df["equity_strategy"] / bt_df["equity_strategy"].cummax() - 1) * 100
-    plt.figure(figsize=(10, 4))
-    plt.fill_between(bt_df.index, drawdown, 0, alpha=0.3, color='red')
-    plt.plot(bt_df.index, drawdown, color='darkred', linewidth=2)
-    plt.title("Strategy Drawdown")
-    plt.xlabel("Date")
-    plt.ylabel("Drawdown (%)")
-    plt.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-    plt.tight_layout()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close()
-    return f"data:image/png;base64,{img_base64}"
+    equity = bt_df["equity_strategy"].to_numpy(dtype=np.float64)
+    drawdown = (equity / np.maximum.accumulate(equity) - 1) * 100
+    with _fig_dd_lock:
+        ax = _ax_dd
+        ax.clear()
+        ax.fill_between(bt_df.index, drawdown, 0, alpha=0.3, color='red')
+        ax.plot(bt_df.index, drawdown, color='darkred', linewidth=2)
+        ax.set_title("Strategy Drawdown")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Drawdown (%)")
+        ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+        _fig_dd.tight_layout()
+        return _canvas_to_data_uri(_canvas_dd)
+
+def _table_records(rows: pd.DataFrame) -> list[dict]:
+    """
+    Serialize a few backtest rows to JSON-ready dicts, date index first as 'Date'.
+    Each column is converted once with ndarray.tolist() (native Python scalars).
+    """
+    cols = {"Date": rows.index.strftime("%Y-%m-%d").tolist()}
+    cols.update({c: rows[c].to_numpy().tolist() for c in rows.columns})
+    return [dict(zip(cols, row)) for row in zip(*cols.values())]
+
+def _volatility_snapshot(close: pd.Series) -> tuple[str, float]:
+    """Current realized-vol regime (prices from Yahoo)."""
+    try:
+        rv = _rvol_from_price(close, window=20)
+        rv = rv.dropna()
+
+        if len(rv) > 0:
+            current_rv = float(rv.iloc[-1])
+            # Determine regime based on percentile
+            q75 = rv.quantile(0.75)
+            q25 = rv.quantile(0.25)
+
+            if current_rv > q75:
+                return "HIGH_VOL", current_rv
+            elif current_rv < q25:
+                return "LOW_VOL", current_rv
+            return "MID_VOL", current_rv
+        return "N/A", 0.0
+    except Exception as e:
+        return "N/A", 0.0
+
+def _rate_snapshot(start: str, end: str | None) -> tuple[str, float]:
+    """Current interest rate trend and 10Y yield (yields from FRED - more accurate)."""
+    try:
+        y10_prices = fetch_fred_yield("DGS10", start, end)
+        rate_regime = interest_rate_regime(y10_prices)
+        rate_trend_series = rate_regime["rate_trend"].dropna()
+        y10_rate_series = rate_regime["y10_rate_decimal"].dropna()
+
+        current_rate_trend = rate_trend_series.iloc[-1] if len(rate_trend_series) > 0 else "N/A"
+        current_y10_rate = float(y10_rate_series.iloc[-1]) if len(y10_rate_series) > 0 else 0.0
+        return current_rate_trend, current_y10_rate
+    except Exception as e:
+        return "N/A", 0.0
+
+def _liquidity_snapshot(hyg_close: pd.Series | None, lqd_close: pd.Series | None) -> tuple[str, float]:
+    """Current liquidity regime (prices from Yahoo: HYG & LQD ETFs)."""
+    try:
+        if hyg_close is None or lqd_close is None:
+            return "N/A", 0.0
+        liq_regime = liquidity_regime(hyg_close, lqd_close)
+        liq_label_series = liq_regime["liquidity_label"].dropna()
+        hyg_lqd_ratio_series = liq_regime["hyg_lqd_ratio"].dropna()
+
+        current_liquidity = liq_label_series.iloc[-1] if len(liq_label_series) > 0 else "N/A"
+        current_ratio = float(hyg_lqd_ratio_series.iloc[-1]) if len(hyg_lqd_ratio_series) > 0 else 0.0
+        return current_liquidity, current_ratio
+    except Exception as e:
+        return "N/A", 0.0
 
 @app.post("/api/calculate")
 async def calculate_strategy(request: CalculationRequest):
@@ -435,78 +986,44 @@ async def calculate_strategy(request: CalculationRequest):
         # PRICES: Yahoo Finance (stocks, ETFs)
         # YIELDS: FRED (Treasury data, more accurate)
         
-        # Fetch prices from Yahoo Finance
-        stock_prices = fetch_prices(args["ticker"], args["start"], args["end"])
-        market_prices = fetch_prices(args["market"], args["start"], args["end"])
-
-        combined = pd.concat([stock_prices, market_prices], axis=1, join="inner")
-        stock_ret = compute_returns(combined[args["ticker"]])
-        market_ret = compute_returns(combined[args["market"]])
-
-        aligned = pd.concat([stock_ret, market_ret], axis=1, join="inner")
-        stock_ret = aligned[args["ticker"]]
-        market_ret = aligned[args["market"]]
+        # The three regime branches are independent and run in the default
+        # executor; the FRED fetch doesn't need prices, so it starts first.
+        loop = asyncio.get_running_loop()
+        rate_future = loop.run_in_executor(None, _rate_snapshot, args["start"], args["end"])
+
+        # Fetch prices from Yahoo Finance (stock, market and credit ETFs in one request)
+        prices = await loop.run_in_executor(
+            None, fetch_prices_batch,
+            [args["ticker"], args["market"], "HYG", "LQD"], args["start"], args["end"],
+        )
+        for ticker in (args["ticker"], args["market"]):
+            if ticker not in prices:
+                raise ValueError(f"No data returned for {ticker}. Check ticker/date range or internet access.")
+        stock_prices = prices[args["ticker"]]
+        market_prices = prices[args["market"]]
+
+        combined = pd.concat([stock_prices, market_prices], axis=1, join="inner").dropna()
+        rets = compute_returns(combined)
+        stock_ret = rets.iloc[:, 0]
+        market_ret = rets.iloc[:, 1]
+
+        vol_future = loop.run_in_executor(None, _volatility_snapshot, combined.iloc[:, 0])
+        liq_future = loop.run_in_executor(None, _liquidity_snapshot, prices.get("HYG"), prices.get("LQD"))
 
         capm = summarize_capm(stock_ret, market_ret, args["risk_free"])
 
-        spot = float(combined[args["ticker"]].iloc[-1])
+        spot = float(combined.iloc[:, 0].iloc[-1])
         strike = float(args["strike"] if args["strike"] is not None else spot * 1.05)
         time_years = float(args["days"] / TRADING_DAYS)
         call_price = black_scholes_call(spot, strike, time_years, args["risk_free"], capm["vol"])
 
         backtest, bt_df = backtest_capm_strategy(stock_ret, market_ret, args["risk_free"], args["window"])
 
-        # Calculate volatility regime (prices from Yahoo)
-        try:
-            rv = _rvol_from_price(combined[args["ticker"]], window=20)
-            rv = rv.dropna()
-            
-            if len(rv) > 0:
-                current_rv = float(rv.iloc[-1])
-                # Determine regime based on percentile
-                median_rv = rv.median()
-                q75 = rv.quantile(0.75)
-                q25 = rv.quantile(0.25)
-                
-                if current_rv > q75:
-                    current_regime = "HIGH_VOL"
-                elif current_rv < q25:
-                    current_regime = "LOW_VOL"
-                else:
-                    current_regime = "MID_VOL"
-            else:
-                current_regime = "N/A"
-                current_rv = 0.0
-        except Exception as e:
-            current_regime = "N/A"
-            current_rv = 0.0
-
-        # Calculate interest rate regime (yields from FRED - more accurate)
-        try:
-            y10_prices = fetch_fred_yield("DGS10", args["start"], args["end"])
-            rate_regime = interest_rate_regime(y10_prices)
-            rate_trend_series = rate_regime["rate_trend"].dropna()
-            y10_rate_series = rate_regime["y10_rate_decimal"].dropna()
-            
-            current_rate_trend = rate_trend_series.iloc[-1] if len(rate_trend_series) > 0 else "N/A"
-            current_y10_rate = float(y10_rate_series.iloc[-1]) if len(y10_rate_series) > 0 else 0.0
-        except Exception as e:
-            current_rate_trend = "N/A"
-            current_y10_rate = 0.0
-
-        # Calculate liquidity regime (prices from Yahoo: HYG & LQD ETFs)
-        try:
-            hyg_prices = fetch_prices("HYG", args["start"], args["end"])
-            lqd_prices = fetch_prices("LQD", args["start"], args["end"])
-            liq_regime = liquidity_regime(hyg_prices, lqd_prices)
-            liq_label_series = liq_regime["liquidity_label"].dropna()
-            hyg_lqd_ratio_series = liq_regime["hyg_lqd_ratio"].dropna()
-            
-            current_liquidity = liq_label_series.iloc[-1] if len(liq_label_series) > 0 else "N/A"
-            current_ratio = float(hyg_lqd_ratio_series.iloc[-1]) if len(hyg_lqd_ratio_series) > 0 else 0.0
-        except Exception as e:
-            current_liquidity = "N/A"
-            current_ratio = 0.0
+        (
+            (current_regime, current_rv),
+            (current_rate_trend, current_y10_rate),
+            (current_liquidity, current_ratio),
+        ) = await asyncio.gather(vol_future, rate_future, liq_future)
 
         capm_summary = {
             "ticker": args["ticker"],
@@ -548,17 +1065,13 @@ async def calculate_strategy(request: CalculationRequest):
         equity_plot = generate_plot(bt_df)
         drawdown_plot = generate_drawdown_plot(bt_df)
 
-        # Reset index to convert dates to column, filter for active positions, then convert to dict
-        bt_df_with_dates = bt_df.reset_index()
-        bt_df_with_dates['Date'] = bt_df_with_dates['Date'].astype(str)
-        
         # Filter for rows where signal is 1 (in position) OR show last 10 rows regardless
-        active_rows = bt_df_with_dates[bt_df_with_dates['signal'] == 1]
+        active_rows = bt_df[bt_df['signal'].to_numpy() == 1]
         if len(active_rows) >= 5:
-            table_data = active_rows.tail(10).to_dict(orient="records")
+            table_data = _table_records(active_rows.tail(10))
         else:
             # If less than 5 active positions, show all data with last 10 rows
-            table_data = bt_df_with_dates.tail(10).to_dict(orient="records")
+            table_data = _table_records(bt_df.tail(10))
 
         return {
             "capm_summary": capm_summary,
@@ -604,12 +1117,14 @@ def get_financial_data(ticker: str):
     """Fetch quarterly financial data from Yahoo Finance with caching"""
     try:
         # Check cache
-        if ticker in financial_cache:
-            cache_time, cached_data = financial_cache[ticker]
-            if time.time() - cache_time < CACHE_DURATION:
-                cached_data['cached'] = True
-                cached_data['cache_timestamp'] = datetime.fromtimestamp(cache_time).strftime('%Y-%m-%d %H:%M:%S')
-                return cached_data
+        with financial_cache_lock:
+            cached_data = financial_cache.get(ticker)
+        if cached_data is not None:
+            return {
+                **cached_data,
+                'cached': True,
+                'cache_timestamp': cached_data['fetch_timestamp'],
+            }
         
         # Fetch fresh data
         stock = yf.Ticker(ticker)
@@ -682,7 +1197,8 @@ def get_financial_data(ticker: str):
         }
         
         # Cache the data
-        financial_cache[ticker] = (time.time(), financials)
+        with financial_cache_lock:
+            financial_cache[ticker] = financials
         return financials
         
     except Exception as e: